@@ -0,0 +1 @@
+"""Helpers shared across the pipeline steps and the dashboard."""
@@ -0,0 +1,19 @@
+"""
+Model artefact helpers shared by the inference scripts.
+"""
+from pathlib import Path
+
+import lightgbm as lgb
+
+
+def load_booster(model_dir) -> lgb.Booster:
+    """Raw LightGBM booster from downloaded model artefacts (bypasses pyfunc).
+
+    Uses the ``model.txt`` written by train.py; older registry versions only
+    hold the sklearn wrapper, so fall back to its ``booster_``.
+    """
+    txt = Path(model_dir) / "model.txt"
+    if txt.exists():
+        return lgb.Booster(model_file=str(txt))
+    import mlflow.sklearn                                   # only for the legacy path
+    return mlflow.sklearn.load_model(model_dir).booster_
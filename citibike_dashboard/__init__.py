@@ -0,0 +1 @@
+"""Citi Bike Streamlit dashboard (forecast + monitoring pages)."""
@@ -0,0 +1,336 @@
+# core.py ────────────────────────────────────────────────────────────
+# Citi Bike Forecast & Monitoring dashboard (Streamlit) — shared by the
+# streamlit/app.py and streamlit_app/app.py entry scripts so both hit the
+# same cached login / frames.
+# -------------------------------------------------------------------
+import os
+from pathlib import Path
+
+import yaml
+import duckdb
+import hopsworks
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import streamlit as st
+import plotly.express as px
+
+from citibike_common.parquet_io import feature_group_snapshot
+
+EXCLUDED_STATIONS = ["5788.13"]
+MAX_CHART_POINTS  = 2000              # per trace sent to the browser
+
+# libyaml-backed loader when available
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# ─────────────────── Load config ────────────────────
+@st.cache_resource
+def load_config():
+    """Parse config.yaml and merge secrets once per process (not on every rerun)."""
+    config_path = Path("./configs/config.yaml")
+    if config_path.exists():
+        with open(config_path) as f:
+            cfg = yaml.load(f, Loader=YAML_LOADER)
+    else:
+        cfg = {}
+
+    # Override or fill from secrets if present
+    if "project" not in cfg:
+        cfg["project"] = {}
+
+    project_cfg = cfg["project"]
+    secrets_proj = st.secrets.get("project", {})
+
+    project_cfg["name"] = secrets_proj.get("name")
+    project_cfg["host"] = secrets_proj.get("host", "c.app.hopsworks.ai")
+    project_cfg["api_key"] = secrets_proj.get("api_key")
+
+    return cfg
+
+# -------------------------------------------------------------------
+# 1️⃣  Data loaders (cached)
+# -------------------------------------------------------------------
+@st.cache_resource(ttl=3600, show_spinner="🔑  Logging in to Hopsworks…")
+def _login():
+    CFG = load_config()
+    return hopsworks.login(
+        project=CFG["project"]["name"],
+        api_key_value=CFG["project"]["api_key"],
+        host=CFG["project"].get("host", "c.app.hopsworks.ai"),
+    )
+
+def _normalize(tbl: pa.Table) -> pa.Table:
+    """String station IDs, UTC hours and the excluded station removed — all in Arrow."""
+    sid = pc.cast(tbl["start_station_id"], pa.string())
+    hour = pc.cast(tbl["hour"], pa.timestamp("ns", tz="UTC"))
+    tbl = tbl.set_column(tbl.schema.get_field_index("start_station_id"), "start_station_id", sid)
+    tbl = tbl.set_column(tbl.schema.get_field_index("hour"), "hour", hour)
+    mask = pc.invert(pc.is_in(tbl["start_station_id"], value_set=pa.array(EXCLUDED_STATIONS)))
+    return tbl.filter(mask)
+
+@st.cache_data(ttl=3600, show_spinner="📦  Fetching feature groups…")
+def _load_frames():
+    project = _login()
+    fs = project.get_feature_store()
+
+    # Local Arrow snapshots (refreshed only on a new FG commit), pruned to the
+    # columns we use; converted to pandas only after filtering
+    pred_path  = feature_group_snapshot(fs, "citibike_predictions", 1)
+    feats_path = feature_group_snapshot(fs, "citibike_features", 1)
+    pred_tbl  = ds.dataset(pred_path, format="parquet").to_table(
+        columns=["start_station_id", "hour", "prediction"]
+    )
+    feats_tbl = ds.dataset(feats_path, format="parquet").to_table(
+        columns=["start_station_id", "hour", "rides"]
+    )
+
+    # ignore_metadata: the snapshot's pandas metadata would restore the
+    # original (NYC) tz on hour and undo _normalize's UTC cast
+    pred_df  = _normalize(pred_tbl).to_pandas(ignore_metadata=True)
+    feats_df = _normalize(feats_tbl).to_pandas(ignore_metadata=True)
+    # display-only precision: halves the bytes cached and shipped to the browser
+    pred_df["prediction"] = pred_df["prediction"].astype("float32")
+    feats_df["rides"]     = feats_df["rides"].astype("int32")
+
+    # One shared categorical dtype for station IDs: isin / groupby / merge then
+    # compare small integer codes instead of hashing Python strings
+    station_dtype = pd.CategoricalDtype(
+        sorted(set(pred_df["start_station_id"]) | set(feats_df["start_station_id"]))
+    )
+    for df in (pred_df, feats_df):
+        df["start_station_id"] = df["start_station_id"].astype(station_dtype)
+
+    # Dense hour × station forecast matrix: selections become column picks + row sums
+    pred_wide = pred_df.pivot(
+        index="hour", columns="start_station_id", values="prediction"
+    ).astype("float32")
+
+    id2name_manual = {
+        "6140.05": "W 21 St & 6 Ave",
+        "5905.14": "University Pl & E 14 St",
+        "5329.03": "West St & Chambers St",
+    }
+
+    # snapshot file names embed the FG commit ids → cache key for derived data
+    snapshot_key = (pred_path.name, feats_path.name)
+    return pred_df, feats_df, pred_wide, id2name_manual, snapshot_key
+
+@st.cache_data(ttl=3600, show_spinner="🔗  Joining predictions with actuals…")
+def _load_joined(snapshot_key) -> pa.Table:
+    """Prediction ⋈ actuals as an Arrow table, hash-joined in DuckDB."""
+    pred_df, feats_df, _, _, _ = _load_frames()
+    con = duckdb.connect()
+    con.execute("SET TimeZone = 'UTC'")
+    con.register("pred", pred_df)
+    con.register("feats", feats_df)
+    joined = con.execute("""
+        SELECT p.start_station_id::VARCHAR AS start_station_id, p.hour, p.prediction, f.rides
+        FROM pred p
+        JOIN feats f
+          ON p.start_station_id::VARCHAR = f.start_station_id::VARCHAR
+         AND p.hour = f.hour
+    """).to_arrow_table()          # materialised pa.Table (picklable, indexable)
+    con.close()
+    return joined
+
+@st.cache_data(ttl=3600)
+def _forecast_slice(selection: tuple[str, ...], snapshot_key):
+    """Per-selection forecast slice + KPIs; keyed on the (sorted) selection tuple."""
+    pred_df, _, pred_wide, _, _ = _load_frames()
+    sel_pred = pred_df[station_mask(pred_df, selection)]
+
+    # hours where none of the selected stations has a forecast stay out of the series
+    sub = pred_wide[list(selection)]
+    chart_series = sub.sum(axis=1, min_count=1).dropna()
+    total_pred  = int(chart_series.sum())
+    mean_hourly = chart_series.mean()
+    return sel_pred, total_pred, mean_hourly, chart_series
+
+@st.cache_data(ttl=3600)
+def _monitoring_slice(selection: tuple[str, ...], snapshot_key):
+    """Per-selection joined rows, MAE/MAPE and hourly aggregate; reruns on the same selection are free."""
+    pred_df = _load_frames()[0]
+    joined = _load_joined(snapshot_key)                 # Arrow table
+    jsel_tbl = joined.filter(
+        pc.is_in(joined["start_station_id"], value_set=pa.array(selection, pa.string()))
+    )
+    if jsel_tbl.num_rows == 0:
+        return pd.DataFrame(), None, None, None
+
+    # Error metrics in Arrow kernels; only the two scalars cross into Python
+    rides_f = pc.cast(jsel_tbl["rides"], pa.float64())
+    err     = pc.subtract(jsel_tbl["prediction"], rides_f)
+    abs_err = pc.abs(err)
+    ape     = pc.divide(abs_err, pc.if_else(pc.equal(rides_f, 0), pa.scalar(None, pa.float64()), rides_f))
+
+    mae  = round(pc.mean(abs_err).as_py(), 2)
+    mape = pc.mean(ape).as_py()                         # None when every actual is 0
+
+    jsel = (
+        jsel_tbl.append_column("error", err)
+        .append_column("abs_error", abs_err)
+        .append_column("ape", ape)
+        .to_pandas()
+    )
+    jsel["start_station_id"] = jsel["start_station_id"].astype(pred_df["start_station_id"].dtype)
+
+    # Aggregate across selected stations by hour
+    agg_df = (
+        jsel.groupby("hour", observed=True, sort=False)[["rides", "prediction"]]
+        .sum()
+        .astype("float32")
+        .reset_index()
+        .sort_values("hour")
+    )
+    return jsel, mae, mape, agg_df
+
+def _cap_points(agg_df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    """Average the hourly series into fixed buckets so at most MAX_CHART_POINTS rows are plotted.
+
+    Returns the (possibly bucketed) frame and the bucket width in hours (1 = untouched).
+    """
+    span_h = int((agg_df["hour"].max() - agg_df["hour"].min()) / pd.Timedelta(hours=1)) + 1
+    bucket_h = -(-span_h // MAX_CHART_POINTS)          # ceil division
+    if bucket_h <= 1:
+        return agg_df, 1
+    chart_df = (
+        agg_df.set_index("hour")
+        .resample(f"{bucket_h}h")
+        .mean()
+        .dropna(how="all")
+        .astype("float32")
+        .reset_index()
+    )
+    return chart_df, bucket_h
+
+def label(sid: str, id2name: dict) -> str:
+    return f"{sid} – {id2name.get(sid, 'Unknown')}"
+
+def station_mask(df: pd.DataFrame, selection) -> pd.Series:
+    """Boolean row mask for the selected stations, compared on categorical codes."""
+    sel_codes = pd.Categorical(selection, dtype=df["start_station_id"].dtype).codes
+    return df["start_station_id"].cat.codes.isin(sel_codes)
+
+def station_names(sids: pd.Series, id2name: dict) -> pd.Series:
+    """Rename the (few) categories instead of mapping every row; unknown IDs keep their ID."""
+    return sids.cat.rename_categories({c: id2name.get(c, c) for c in sids.cat.categories})
+
+@st.cache_data(ttl=3600)
+def _all_stations(snapshot_key) -> list[str]:
+    """Stations with a forecast, read off the (small) categories not the rows."""
+    sids = _load_frames()[0]["start_station_id"]
+    # dtype is shared with feats_df → drop stations that only have actuals
+    return sids.cat.remove_unused_categories().cat.categories.sort_values().tolist()
+
+def _station_picker(text: str, snapshot_key, id2name: dict) -> list[str]:
+    all_stations = _all_stations(snapshot_key)
+    selection = st.multiselect(
+        text,
+        options=all_stations,
+        default=[all_stations[0]] if all_stations else [],
+        format_func=lambda sid: label(sid, id2name),
+    )
+    if not selection:
+        st.warning("Pick at least one station.")
+        st.stop()
+    return selection
+
+# -------------------------------------------------------------------
+# 2️⃣  Forecast page
+# -------------------------------------------------------------------
+def run_forecast_page():
+    _, _, _, id2name, snapshot_key = _load_frames()
+    st.title("📈  24-Hour Citi Bike Ride Forecast")
+
+    selection = _station_picker("Select station(s)", snapshot_key, id2name)
+
+    sel_pred, total_pred, mean_hourly, chart_series = _forecast_slice(
+        tuple(sorted(selection)), snapshot_key
+    )
+
+    kpi1, kpi2 = st.columns(2)
+    kpi1.metric("Total Predicted Rides (24 h)", f"{total_pred:,}")
+    kpi2.metric("Average Rides / Hour",         f"{mean_hourly:,.1f}")
+
+    # one row per (station, hour), so for a single station this is its own series
+    st.line_chart(chart_series, height=350)
+
+    with st.expander("🔍  Raw predictions"):
+        tbl = sel_pred.assign(
+            start_station_name=station_names(sel_pred["start_station_id"], id2name)
+        )
+        st.dataframe(tbl.reset_index(drop=True), use_container_width=True)
+
+# -------------------------------------------------------------------
+# 3️⃣  Monitoring page
+# -------------------------------------------------------------------
+def run_monitoring_page():
+    _, _, _, id2name, snapshot_key = _load_frames()
+    st.title("🩺  Model Monitoring – Prediction vs Actuals")
+
+    selection = _station_picker("Select station(s) to monitor", snapshot_key, id2name)
+
+    jsel, mae, mape, agg_df = _monitoring_slice(tuple(sorted(selection)), snapshot_key)
+    if jsel.empty:
+        st.info("❔ No overlapping actuals yet for these predictions. "
+                "Wait until rides appear in the feature group.")
+        st.stop()
+
+    mape_str = "n/a"
+    if mape is not None:
+        mape_str = f"{round(mape * 100, 2):.2f} %"
+
+    col1, col2 = st.columns(2)
+    col1.metric("MAE (joined horizon)", f"{mae:,.2f}")
+    col2.metric("MAPE", mape_str)
+
+    st.subheader("Actual vs Predicted Rides (Hourly Total)")
+
+    chart_df, bucket_h = _cap_points(agg_df)
+    if bucket_h > 1:
+        st.caption(f"Long horizon: showing {bucket_h}-hour averages "
+                   f"(capped at {MAX_CHART_POINTS:,} points per line).")
+
+    # single station → lightweight built-in chart; Plotly only when aggregating several
+    if len(selection) == 1:
+        st.line_chart(chart_df.set_index("hour"), height=500)
+    else:
+        fig = px.line(
+            chart_df,
+            x="hour",
+            y=["rides", "prediction"],
+            title="Actual vs Predicted Hourly Rides (Aggregated)",
+            labels={"value": "Number of Rides", "hour": "Time", "variable": "Type"},
+            height=500,
+        )
+
+        fig.update_layout(
+            legend_title_text="Type",
+            hovermode="x unified",
+            template="plotly_dark" if st.get_option("theme.base") == "dark" else "plotly"
+        )
+
+        st.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("🔍  Joined prediction / actual table"):
+        jdisp = jsel.assign(
+            start_station_name=station_names(jsel["start_station_id"], id2name)
+        )
+        st.dataframe(jdisp.reset_index(drop=True), use_container_width=True)
+
+# -------------------------------------------------------------------
+# 4️⃣  Entry point (sidebar navigation)
+# -------------------------------------------------------------------
+def main():
+    st.set_page_config(
+        page_title="Citi Bike – Forecast & Monitoring",
+        layout="wide",
+        page_icon="🚲",
+    )
+    st.sidebar.title("🚲 Citi Bike Dashboard")
+    page = st.sidebar.radio("Go to", ["Forecast Dashboard", "Model Monitoring"])
+    if page == "Forecast Dashboard":
+        run_forecast_page()
+    else:
+        run_monitoring_page()
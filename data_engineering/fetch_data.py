@@ -5,7 +5,14 @@ Usage:
 python data_engineering/fetch_data.py --year 2024 --month 1
 """
 import argparse, os, requests, zipfile, io, pandas as pd, hopsworks, pytz, datetime as dt
+import queue, threading
+import xml.etree.ElementTree as ET
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 from yaml import safe_load
 
 CFG = safe_load(open("./configs/config.yaml"))
@@ -17,37 +24,107 @@ load_dotenv()
 
 FORCED_API_KEY = os.getenv("HOPSWORKS_API_KEY")
 HOPS_HOST = CFG["project"].get("host", "c.app.hopsworks.ai")
+FETCH_WORKERS = CFG.get("fetch", {}).get("workers", 8)
+BUCKET_URL = "https://s3.amazonaws.com/tripdata/"
+
+# One pooled session shared by all download threads (reuses TCP/TLS connections)
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+DOWNLOAD_CHUNK_SIZE = 100 * 1024
+
+# Pin types that block-wise CSV inference could otherwise get wrong (mixed-type station IDs)
+RAW_COLUMN_TYPES = {
+    "ride_id": pa.string(),
+    "started_at": pa.timestamp("ns"),
+    "ended_at": pa.timestamp("ns"),
+    "start_station_id": pa.string(),
+    "end_station_id": pa.string(),
+}
+
+# Background upload queue: a few daemon threads drain it so uploads overlap the
+# next downloads; the worker count also bounds load on the Hopsworks upload API
+UPLOAD_WORKERS = CFG.get("fetch", {}).get("upload_workers", 2)
+UPLOAD_QUEUE = queue.Queue()
+_upload_errors = []
+
+# One Hopsworks login per process, shared by all upload threads
+_project = None
+_project_lock = threading.Lock()
 
 def download_file(url: str, out_dir: Path) -> Path:
     print("Downloading", url)
-    r = requests.get(url, timeout=120)
-    r.raise_for_status()
     filename = url.split("/")[-1]
     out_path = out_dir / filename
-    with open(out_path, "wb") as f:
-        f.write(r.content)
+    # Stream to disk in 100 KiB chunks so multi-GB yearly zips never sit in RAM
+    with SESSION.get(url, stream=True, timeout=120, headers={"Accept-Encoding": "identity"}) as r:
+        r.raise_for_status()
+        with open(out_path, "wb") as f:
+            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
     return out_path
 
-def extract_zip(zip_path: Path, out_dir: Path) -> Path:
-    with zipfile.ZipFile(zip_path, 'r') as zf:
-        zf.extractall(out_dir)
-    # Return first CSV found
-    for f in out_dir.glob("*.csv"):
-        return f
+def _csv_member(zf: zipfile.ZipFile):
+    """First real CSV member of the archive (skips macOS metadata)."""
+    for info in zf.infolist():
+        name = info.filename
+        if not name.endswith(".csv") or name.startswith("__MACOSX/") or Path(name).name.startswith("._"):
+            continue
+        return info
     return None
 
-def process_and_upload(csv_path: Path, out_dir: Path, parquet_name: str):
-    df = pd.read_csv(csv_path, parse_dates=["started_at", "ended_at"], low_memory=False)
-    parquet_path = out_dir / parquet_name
-    df.to_parquet(parquet_path, index=False)
-    upload_to_hopsworks(parquet_path)
+def process_and_upload(zip_path: Path, out_dir: Path, parquet_name: str):
+    """Stream the CSV member straight from the zip into parquet (no CSV temp file)."""
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        member = _csv_member(zf)
+        if member is None:
+            return None
+        parquet_path = out_dir / parquet_name
+        convert_options = pa_csv.ConvertOptions(
+            timestamp_parsers=[pa_csv.ISO8601, "%Y-%m-%d %H:%M:%S"],
+            column_types=RAW_COLUMN_TYPES,
+            strings_can_be_null=True,      # keep blank station fields as nulls in the raw parquet
+        )
+        with zf.open(member) as raw, pa_csv.open_csv(raw, convert_options=convert_options) as reader:
+            with pq.ParquetWriter(parquet_path, reader.schema, compression="zstd") as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+    UPLOAD_QUEUE.put(parquet_path)
+    return parquet_path
+
+def _get_project():
+    global _project
+    with _project_lock:
+        if _project is None:
+            _project = hopsworks.login(project=CFG["project"]["name"], api_key_value=FORCED_API_KEY, host=HOPS_HOST)
+    return _project
 
 def upload_to_hopsworks(local_path:Path):
-    project = hopsworks.login(project=CFG["project"]["name"], api_key_value=FORCED_API_KEY, host=HOPS_HOST)
-    fs = project.get_feature_store()
-    dataset_api = project.get_dataset_api()
+    dataset_api = _get_project().get_dataset_api()
     dataset_api.upload(local_path.as_posix(), "Resources/raw", overwrite=True)
-    print("Uploaded to Hopsworks")
+    print("Uploaded to Hopsworks", local_path)
+
+def _upload_worker():
+    while True:
+        path = UPLOAD_QUEUE.get()
+        try:
+            upload_to_hopsworks(path)
+        except Exception as e:
+            print(f"Upload failed for {path}: {e}")
+            _upload_errors.append(path)
+        finally:
+            UPLOAD_QUEUE.task_done()
+
+def start_upload_workers():
+    for _ in range(UPLOAD_WORKERS):
+        threading.Thread(target=_upload_worker, daemon=True).start()
+
+def flush_uploads():
+    """Block until every queued parquet has been uploaded."""
+    UPLOAD_QUEUE.join()
+    if _upload_errors:
+        raise RuntimeError(f"{len(_upload_errors)} upload(s) to Hopsworks failed: {_upload_errors}")
 
 def month_year_iter(start_year, start_month, end_year, end_month):
     ym_start = 12*start_year + start_month - 1
@@ -69,12 +146,101 @@ def is_new_data_available(latest_year, latest_month, out_dir):
 
 def url_exists(url):
     try:
-        r = requests.head(url, timeout=10)
+        r = SESSION.head(url, timeout=10)
         return r.status_code == 200
     except Exception:
         return False
 
+def _list_bucket_keys():
+    """All object keys in the public tripdata bucket (one paginated listing instead of a HEAD per file)."""
+    keys, marker = [], None
+    while True:
+        r = SESSION.get(BUCKET_URL, params={"marker": marker} if marker else None, timeout=30)
+        r.raise_for_status()
+        truncated = False
+        for _, el in ET.iterparse(io.BytesIO(r.content)):
+            tag = el.tag.rsplit("}", 1)[-1]          # strip the S3 XML namespace
+            if tag == "Key":
+                keys.append(el.text)
+            elif tag == "IsTruncated":
+                truncated = el.text == "true"
+        if not truncated or not keys:
+            return frozenset(keys)
+        marker = keys[-1]
+
+_UNLISTED = object()
+_bucket_keys = _UNLISTED
+_bucket_keys_lock = threading.Lock()
+
+def bucket_keys():
+    """The bucket listing, fetched at most once per process; None if listing failed.
+
+    The lock makes concurrent first callers wait for one listing, and a failure
+    is remembered so later lookups go straight to HEAD.
+    """
+    global _bucket_keys
+    with _bucket_keys_lock:
+        if _bucket_keys is _UNLISTED:
+            try:
+                _bucket_keys = _list_bucket_keys()
+            except Exception as e:
+                print(f"Bucket listing failed ({e}); falling back to HEAD requests")
+                _bucket_keys = None
+        return _bucket_keys
+
+def key_exists(filename):
+    """Set lookup against the bucket listing; falls back to HEAD if listing failed."""
+    keys = bucket_keys()
+    if keys:
+        return filename in keys
+    return url_exists(BUCKET_URL + filename)
+
+def _monthly_url(year, month):
+    """Try .csv.zip first, then .zip; return None if neither exists."""
+    name1 = f"{year}{str(month).zfill(2)}-citibike-tripdata.csv.zip"
+    name2 = f"{year}{str(month).zfill(2)}-citibike-tripdata.zip"
+    name = name1 if key_exists(name1) else name2 if key_exists(name2) else None
+    return BUCKET_URL + name if name else None
+
+def _fetch_one(year, month, out_dir: Path):
+    """Download, extract and upload one month (or one full year when month is None).
+    Returns the produced parquet path, or None if no data file was found."""
+    if month is None:
+        url = f"{BUCKET_URL}{year}-citibike-tripdata.zip"
+        parquet_name = f"clean_{year}.parquet"
+    else:
+        url = _monthly_url(year, month)
+        parquet_name = f"clean_{year}_{str(month).zfill(2)}.parquet"
+    if not url:
+        return None
+    zip_path = download_file(url, out_dir)
+    return process_and_upload(zip_path, out_dir, parquet_name)
+
+def _fetch_all(jobs, out_dir: Path):
+    """Run _fetch_one for every (year, month) job on a thread pool."""
+    results = []
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+        futures = {ex.submit(_fetch_one, y, m, out_dir): (y, m) for y, m in jobs}
+        for i, fut in enumerate(as_completed(futures), 1):
+            y, m = futures[fut]
+            label = f"{y}" if m is None else f"{y}-{m:02d}"
+            path = fut.result()
+            if path:
+                print(f"[{i}/{len(futures)}] {label} → {path}")
+            else:
+                print(f"[{i}/{len(futures)}] No data file found for {label}")
+            results.append(path)
+    return results
+
 def main():
+    start_upload_workers()
+    try:
+        _main()
+    finally:
+        # months that did finish still reach Hopsworks if another one failed
+        flush_uploads()
+
+def _main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--year", type=int, required=False)
     ap.add_argument("--month", type=int, required=False)
@@ -98,15 +264,7 @@ def main():
         args.year = latest_year
         args.month = latest_month
         # Only fetch the latest month and return after processing
-        url1 = f"https://s3.amazonaws.com/tripdata/{args.year}{str(args.month).zfill(2)}-citibike-tripdata.csv.zip"
-        url2 = f"https://s3.amazonaws.com/tripdata/{args.year}{str(args.month).zfill(2)}-citibike-tripdata.zip"
-        url = url1 if url_exists(url1) else url2 if url_exists(url2) else None
-        if url:
-            zip_path = download_file(url, out_dir)
-            csv_path = extract_zip(zip_path, out_dir)
-            if csv_path:
-                process_and_upload(csv_path, out_dir, f"clean_{args.year}_{str(args.month).zfill(2)}.parquet")
-        else:
+        if _fetch_one(args.year, args.month, out_dir) is None:
             print(f"No data file found for {args.year}-{args.month:02d}")
         return
 
@@ -120,42 +278,23 @@ def main():
 
     # Download yearly files if available, else download monthly files
     if args.start_year and args.start_month and args.end_year and args.end_month:
+        bucket_keys()               # list once up front, before the pool threads need it
+        jobs = []
         for year in range(args.start_year, args.end_year+1):
             # If full year is in range and yearly file exists, use it
             is_full_year = (year > args.start_year and year < args.end_year) or \
                 (year == args.start_year and args.start_month == 1 and (year < args.end_year or args.end_month == 12)) or \
                 (year == args.end_year and args.end_month == 12 and (year > args.start_year or args.start_month == 1))
-            yearly_url = f"https://s3.amazonaws.com/tripdata/{year}-citibike-tripdata.zip"
-            if is_full_year and url_exists(yearly_url):
-                zip_path = download_file(yearly_url, out_dir)
-                csv_path = extract_zip(zip_path, out_dir)
-                if csv_path:
-                    process_and_upload(csv_path, out_dir, f"clean_{year}.parquet")
+            if is_full_year and key_exists(f"{year}-citibike-tripdata.zip"):
+                jobs.append((year, None))
                 continue
             # Otherwise, download each month
             start_m = args.start_month if year == args.start_year else 1
             end_m = args.end_month if year == args.end_year else 12
-            for month in range(start_m, end_m+1):
-                # Try .csv.zip first, then .zip
-                url1 = f"https://s3.amazonaws.com/tripdata/{year}{str(month).zfill(2)}-citibike-tripdata.csv.zip"
-                url2 = f"https://s3.amazonaws.com/tripdata/{year}{str(month).zfill(2)}-citibike-tripdata.zip"
-                url = url1 if url_exists(url1) else url2 if url_exists(url2) else None
-                if url:
-                    zip_path = download_file(url, out_dir)
-                    csv_path = extract_zip(zip_path, out_dir)
-                    if csv_path:
-                        process_and_upload(csv_path, out_dir, f"clean_{year}_{str(month).zfill(2)}.parquet")
+            jobs.extend((year, month) for month in range(start_m, end_m+1))
+        _fetch_all(jobs, out_dir)
     elif args.year and args.month:
-        # Try .csv.zip first, then .zip
-        url1 = f"https://s3.amazonaws.com/tripdata/{args.year}{str(args.month).zfill(2)}-citibike-tripdata.csv.zip"
-        url2 = f"https://s3.amazonaws.com/tripdata/{args.year}{str(args.month).zfill(2)}-citibike-tripdata.zip"
-        url = url1 if url_exists(url1) else url2 if url_exists(url2) else None
-        if url:
-            zip_path = download_file(url, out_dir)
-            csv_path = extract_zip(zip_path, out_dir)
-            if csv_path:
-                process_and_upload(csv_path, out_dir, f"clean_{args.year}_{str(args.month).zfill(2)}.parquet")
-        else:
+        if _fetch_one(args.year, args.month, out_dir) is None:
             raise ValueError(f"No data file found for {args.year}-{args.month:02d}")
     else:
         raise ValueError("You must provide either --year and --month, or --start_year, --start_month, --end_year, --end_month.")
@@ -2,12 +2,22 @@
 Placeholder for advanced cleaning (missing values, outlier removal, timezone normalization).
 """
 
+import os
+import sys
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 from pathlib import Path
 import glob
 import zipfile
 import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# repo root on sys.path so every script imports citibike_common the same way
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from citibike_common.parquet_io import write_parquet
 
 RAW_DIR = Path("tmp_raw")
 CLEAN_DIR = RAW_DIR / "cleaned"
@@ -19,9 +29,30 @@ REQUIRED_COLS = [
     "start_station_name", "end_station_name", "start_lat", "start_lng", "end_lat", "end_lng"
 ]
 
+# Low-cardinality string columns stored as categoricals / parquet dictionaries
+CATEGORICAL_COLS = ["rideable_type", "start_station_id", "end_station_id"]
+
+# Explicit schema so the Arrow reader skips dtype inference on the hot columns
+CSV_COLUMN_TYPES = {
+    "ride_id": pa.string(),
+    "rideable_type": pa.dictionary(pa.int32(), pa.string()),
+    "started_at": pa.timestamp("ns"),
+    "ended_at": pa.timestamp("ns"),
+    "start_station_id": pa.string(),
+    "end_station_id": pa.string(),
+    "start_lat": pa.float32(),
+    "start_lng": pa.float32(),
+    "end_lat": pa.float32(),
+    "end_lng": pa.float32(),
+}
+
 # Outlier thresholds
 MIN_TRIP_DURATION_SEC = 60  # 1 minute
 MAX_TRIP_DURATION_SEC = 60 * 60  # 1 hour
+NS_PER_SEC = 1_000_000_000
+
+# Raw Citi Bike timestamps are wall-clock NYC time
+LOCAL_TZ = "America/New_York"
 
 def find_all_csvs_and_unzip(root_dir):
     csv_files = []
@@ -37,8 +68,67 @@ def find_all_csvs_and_unzip(root_dir):
                     csv_files.append(extract_path)
     return csv_files
 
+def read_trips_csv(csv_path):
+    """Multithreaded Arrow CSV read with a fixed schema, converted to pandas once."""
+    table = pa_csv.read_csv(
+        csv_path,
+        read_options=pa_csv.ReadOptions(use_threads=True, block_size=8 << 20),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=CSV_COLUMN_TYPES,
+            timestamp_parsers=[pa_csv.ISO8601, "%Y-%m-%d %H:%M:%S"],
+            # blank fields → null (like pd.read_csv), so dropna removes station-less trips
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas()
+
+def local_to_utc(ts: pd.Series) -> pd.Series:
+    """Localize naive NYC timestamps with Arrow's C++ assume_timezone kernel, return UTC."""
+    arr = pc.assume_timezone(pa.array(ts), LOCAL_TZ, ambiguous="earliest", nonexistent="earliest")
+    return arr.cast(pa.timestamp("ns", tz="UTC")).to_pandas().set_axis(ts.index)
+
+def _clean_one(csv_path: Path):
+    """Clean a single CSV into CLEAN_DIR. Runs in a worker process."""
+    out_path = CLEAN_DIR / (csv_path.stem + "_cleaned.parquet")
+    print(f"Processing {csv_path}")
+    try:
+        df = read_trips_csv(csv_path)
+    except (UnicodeDecodeError, pa.ArrowInvalid):
+        print(f"Skipping non-CSV or corrupted file: {csv_path}")
+        return None
+
+    # Drop rows with missing required fields
+    df = df.dropna(subset=REQUIRED_COLS)
+
+    # Remove trips with negative or extreme durations
+    # (plain int64 nanosecond subtraction, no timedelta/float intermediates)
+    dur_ns = df["ended_at"].values.view("i8") - df["started_at"].values.view("i8")
+    mask = (dur_ns >= MIN_TRIP_DURATION_SEC * NS_PER_SEC) & (dur_ns <= MAX_TRIP_DURATION_SEC * NS_PER_SEC)
+    df = df.loc[mask]
+    df["trip_duration_sec"] = (dur_ns[mask] // NS_PER_SEC).astype("int32")
+
+    # Normalize datetimes to UTC (assume input is local time, convert if needed)
+    if df["started_at"].dt.tz is None:
+        df["started_at"] = local_to_utc(df["started_at"])
+        df["ended_at"] = local_to_utc(df["ended_at"])
+    else:
+        df["started_at"] = df["started_at"].dt.tz_convert("UTC")
+        df["ended_at"] = df["ended_at"].dt.tz_convert("UTC")
+
+    # Narrow coordinates and dictionary-encode repeated strings before writing
+    for c in ("start_lat", "start_lng", "end_lat", "end_lng"):
+        df[c] = df[c].astype("float32")
+    for c in CATEGORICAL_COLS:
+        df[c] = df[c].astype("category")
+
+    # Save cleaned file
+    write_parquet(df, out_path, sort_by=["start_station_id", "started_at"])
+    return out_path
+
 def main():
-    csv_files = find_all_csvs_and_unzip(RAW_DIR)
+    # dict.fromkeys drops duplicates (a CSV can be found on disk and inside its zip)
+    csv_files = list(dict.fromkeys(find_all_csvs_and_unzip(RAW_DIR)))
+    todo = []
     for csv_path in csv_files:
         # Skip macOS metadata and hidden files
         if csv_path.name.startswith("._") or "__MACOSX" in str(csv_path):
@@ -48,31 +138,15 @@ def main():
         if out_path.exists():
             print(f"Skipping {csv_path}, cleaned file already exists.")
             continue
-        print(f"Processing {csv_path}")
-        try:
-            df = pd.read_csv(csv_path, parse_dates=["started_at", "ended_at"], low_memory=False)
-        except UnicodeDecodeError:
-            print(f"Skipping non-CSV or corrupted file: {csv_path}")
-            continue
-
-        # Drop rows with missing required fields
-        df = df.dropna(subset=REQUIRED_COLS)
-
-        # Remove trips with negative or extreme durations
-        df["trip_duration_sec"] = (df["ended_at"] - df["started_at"]).dt.total_seconds()
-        df = df[(df["trip_duration_sec"] >= MIN_TRIP_DURATION_SEC) & (df["trip_duration_sec"] <= MAX_TRIP_DURATION_SEC)]
-
-        # Normalize datetimes to UTC (assume input is local time, convert if needed)
-        if df["started_at"].dt.tz is None:
-            df["started_at"] = df["started_at"].dt.tz_localize("America/New_York", ambiguous='NaT').dt.tz_convert("UTC")
-            df["ended_at"] = df["ended_at"].dt.tz_localize("America/New_York", ambiguous='NaT').dt.tz_convert("UTC")
-        else:
-            df["started_at"] = df["started_at"].dt.tz_convert("UTC")
-            df["ended_at"] = df["ended_at"].dt.tz_convert("UTC")
+        todo.append(csv_path)
 
-        # Save cleaned file
-        df.to_parquet(out_path, index=False)
-        print(f"Saved cleaned data to {out_path}")
+    # Files are independent → clean them on all cores
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        futures = {ex.submit(_clean_one, p): p for p in todo}
+        for fut in as_completed(futures):
+            out_path = fut.result()
+            if out_path:
+                print(f"Saved cleaned data to {out_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,4 +1,5 @@
 import pandas as pd
+import pyarrow.parquet as pq
 from pathlib import Path
 import re
 
@@ -6,13 +7,32 @@ import re
 cleaned_dir = Path("tmp_raw/cleaned")
 files = list(cleaned_dir.glob("*_cleaned.parquet"))
 
-# Extract years from filenames
+def years_from_stats(path):
+    """Years spanned by started_at, from row-group min/max stats (footer only, no data pages)."""
+    pf = pq.ParquetFile(path)
+    idx = pf.schema_arrow.get_field_index("started_at")
+    if idx < 0:
+        return set()
+    found = set()
+    for i in range(pf.metadata.num_row_groups):
+        stats = pf.metadata.row_group(i).column(idx).statistics
+        if stats is None or not stats.has_min_max:
+            continue
+        lo, hi = (pd.Timestamp(v) for v in (stats.min, stats.max))
+        lo, hi = (t.tz_localize("UTC") if t.tz is None else t for t in (lo, hi))
+        found.update(range(lo.tz_convert("America/New_York").year, hi.tz_convert("America/New_York").year + 1))
+    return found
+
+# Extract years from parquet footers, falling back to filenames
 years = set()
 year_pattern = re.compile(r"(20\d{2})")
 for f in files:
-    match = year_pattern.search(f.name)
-    if match:
-        years.add(int(match.group(1)))
+    file_years = years_from_stats(f)
+    if not file_years:
+        match = year_pattern.search(f.name)
+        if match:
+            file_years = {int(match.group(1))}
+    years |= file_years
 
 if years:
     print(f"Years covered in cleaned features: {sorted(years)}")
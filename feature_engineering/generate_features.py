@@ -1,6 +1,8 @@
 import pandas as pd, numpy as np, hopsworks, pytz, yaml, os
+import duckdb
 from pathlib import Path
 import datetime as dt
+import sys
 
 CFG = yaml.safe_load(open("./configs/config.yaml"))
 
@@ -8,9 +10,14 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
+# repo root on sys.path so every script imports citibike_common the same way
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from citibike_common.parquet_io import write_parquet
+
 FORCED_API_KEY = os.getenv("HOPSWORKS_API_KEY")
 HOPS_HOST = CFG["project"].get("host", "c.app.hopsworks.ai")
 LOCAL_TZ  = pytz.timezone(CFG["project"]["timezone"])      # America/New_York
+CACHE_DIR = Path("tmp_raw/cache")                          # per-file hourly counts
 
 def localise_start(ts_series: pd.Series) -> pd.Series:
     """Treat naïve datetimes as NYC local; convert others."""
@@ -18,66 +25,79 @@ def localise_start(ts_series: pd.Series) -> pd.Series:
         return ts_series.dt.tz_localize(LOCAL_TZ)
     return ts_series.dt.tz_convert(LOCAL_TZ)
 
+def _hourly_counts_for_file(con, f: Path) -> pd.DataFrame:
+    """Rides per (station, UTC hour) for one cleaned parquet file, aggregated in DuckDB.
+
+    NYC offsets are whole hours, so truncating in UTC equals truncating in
+    local time and stays unambiguous across DST changes.
+    """
+    return con.execute("""
+        SELECT start_station_id::VARCHAR     AS start_station_id,
+               date_trunc('hour', started_at) AS hour,
+               COUNT(*)                       AS rides
+        FROM read_parquet(?)
+        WHERE start_station_id IS NOT NULL
+        GROUP BY 1, 2
+    """, [f.as_posix()]).df()
+
 def get_hourly_counts_batched():
     cleaned_dir = Path("tmp_raw/cleaned")
     files = list(cleaned_dir.glob("*_cleaned.parquet"))
     if not files:
         raise FileNotFoundError("No cleaned parquet files found in tmp_raw/cleaned.")
 
-    # ---------- pass 1: find top-N stations ----------
-    station_counts = {}
-    for f in files:
-        df = pd.read_parquet(f, columns=["start_station_id"])
-        df["start_station_id"] = df["start_station_id"].astype(str)
-        for sid, cnt in df["start_station_id"].value_counts().items():
-            station_counts[sid] = station_counts.get(sid, 0) + cnt
-
-    top_stations = (
-        pd.Series(station_counts)
-        .nlargest(CFG["data"]["top_n_stations"])
-        .index
-        .tolist()
-    )
+    con = duckdb.connect()
+    con.execute("SET TimeZone = 'UTC'")
 
-    # ---------- pass 2: hourly counts for top stations ----------
+    # ---------- single pass: hourly counts for every station ----------
+    # Per-file results are cached and only recomputed when the source is newer
+    CACHE_DIR.mkdir(exist_ok=True, parents=True)
     hourly_parts = []
     for f in files:
-        df = pd.read_parquet(f)
-        df["start_station_id"] = df["start_station_id"].astype(str)
-        df = df[df["start_station_id"].isin(top_stations)]
-
-        df["started_at"] = localise_start(df["started_at"])
-        df["hour"] = df["started_at"].dt.floor("H")
+        cache = CACHE_DIR / (f.stem + ".hourly.parquet")
+        if cache.exists() and cache.stat().st_mtime >= f.stat().st_mtime:
+            hourly_parts.append(pd.read_parquet(cache))
+            continue
+        grp = _hourly_counts_for_file(con, f)
+        grp.to_parquet(cache, index=False)
+        hourly_parts.append(grp)
 
-        grp = (
-            df.groupby(["start_station_id", "hour"])
-            .size()
-            .reset_index(name="rides")
+    # ---------- combine months + keep top-N stations by total rides ----------
+    con.register("parts", pd.concat(hourly_parts, ignore_index=True))
+    hourly = con.execute(f"""
+        WITH hourly AS (
+            SELECT start_station_id, hour, SUM(rides)::BIGINT AS rides   -- SUM → HUGEINT → float64 in .df()
+            FROM parts GROUP BY 1, 2
+        ), top AS (
+            SELECT start_station_id FROM hourly
+            GROUP BY 1 ORDER BY SUM(rides) DESC
+            LIMIT {int(CFG["data"]["top_n_stations"])}
         )
-        hourly_parts.append(grp)
+        SELECT h.* FROM hourly h JOIN top USING (start_station_id)
+        ORDER BY 1, 2
+    """).df()
+    con.close()
 
-    hourly = (
-        pd.concat(hourly_parts, ignore_index=True)
-        .groupby(["start_station_id", "hour"])
-        .sum()
-        .reset_index()
-    )
+    hourly["hour"] = localise_start(hourly["hour"])
     return hourly
 
 def create_lag_features(df, lags=28):
-    dfs = [df]
-    for l in range(1, lags + 1):
-        shifted = df.copy()
-        shifted["hour"] += pd.Timedelta(hours=l)
-        shifted = shifted.rename(columns={"rides": f"lag_{l}"})
-        dfs.append(shifted)
-
-    wide = dfs[0]
-    for d in dfs[1:]:
-        wide = wide.merge(d, on=["start_station_id", "hour"], how="left")
-
+    df = df.sort_values(["start_station_id", "hour"]).reset_index(drop=True)
+
+    # Dense hourly grid per station (missing hours → 0 rides) so a positional
+    # shift(l) is exactly "l hours earlier"
+    dense = (
+        df.set_index("hour")
+        .groupby("start_station_id")["rides"]
+        .resample("h")
+        .sum()
+    )
+    g = dense.groupby(level="start_station_id", sort=False)
     lag_cols = [f"lag_{l}" for l in range(1, lags + 1)]
-    wide[lag_cols] = wide[lag_cols].fillna(0)
+    lagged = pd.concat({f"lag_{l}": g.shift(l) for l in range(1, lags + 1)}, axis=1)
+
+    wide = df.join(lagged, on=["start_station_id", "hour"])
+    wide[lag_cols] = wide[lag_cols].fillna(0).astype("float64")
     return wide
 
 def is_new_data_present():
@@ -102,7 +122,7 @@ def main():
 
     hourly = get_hourly_counts_batched()
     features = create_lag_features(hourly, CFG["model"]["lags"])
-    features.to_parquet("tmp_raw/citibike_features.parquet", index=False)
+    write_parquet(features, "tmp_raw/citibike_features.parquet", sort_by=["start_station_id", "hour"])
     print("Feature engineering complete → tmp_raw/citibike_features.parquet")
 
     project = hopsworks.login(
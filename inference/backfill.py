@@ -7,10 +7,17 @@ Outputs:
   • Parquet  → Resources/predictions/predictions_backfill.parquet
   • Feature group → citibike_predictions  (upsert)
 """
+import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import mlflow, hopsworks, yaml
 
+# repo root on sys.path so every script imports citibike_common the same way
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from citibike_common.model_io import load_booster
+from citibike_common.parquet_io import load_feature_group_cached, write_parquet
+
 CFG   = yaml.safe_load(open(Path("./configs/config.yaml")))
 LAGS  = CFG["model"]["lags"]
 HOURS_TO_BACKFILL = 7 * 24            # 168 h
@@ -29,28 +36,37 @@ def main():
     fs = project.get_feature_store()
     mlflow.set_tracking_uri(CFG["mlflow"]["tracking_uri"])
 
-    # ── load latest features ──────────────────────────────────
-    feat_df = fs.get_feature_group("citibike_features", version=1).read()
+    # ── load latest features (last 168 h only) ───────────────
+    # single-column read to find the newest hour, then filter + prune on read
+    latest_ts = load_feature_group_cached(fs, "citibike_features", 1, columns=["hour"])["hour"].max()
+    earliest  = latest_ts - pd.Timedelta(hours=HOURS_TO_BACKFILL - 1)
+
+    feat_df = load_feature_group_cached(
+        fs, "citibike_features", 1,
+        columns=["start_station_id", "hour", f"{LAG_COL_PATTERN}*"],
+        filters=[("hour", ">=", earliest)],
+    )
     lag_cols = _sort_lags([c for c in feat_df.columns if c.startswith(LAG_COL_PATTERN)])
 
     # keep IDs as str (consistent with previous steps)
     feat_df["start_station_id"] = feat_df["start_station_id"].astype(str)
 
     # ── slice: last 168 h across *all* stations ───────────────
-    latest_ts = feat_df["hour"].max()
-    earliest  = latest_ts - pd.Timedelta(hours=HOURS_TO_BACKFILL - 1)
-
     week_df = feat_df[feat_df["hour"].between(earliest, latest_ts)].copy()
 
     # ── load production model ─────────────────────────────────
     model_dir = project.get_model_registry().get_model("citibike_best").download()
-    model     = mlflow.pyfunc.load_model(model_dir)
+    booster   = load_booster(model_dir)
 
-    week_df["prediction"] = model.predict(week_df[lag_cols])
+    X = week_df[booster.feature_name()].to_numpy(dtype=np.float32)
+    week_df["prediction"] = booster.predict(X)
 
     # ── save parquet for Streamlit ────────────────────────────
     out_path = Path("predictions_backfill.parquet")
-    week_df[["start_station_id", "hour", "prediction"]].to_parquet(out_path, index=False)
+    write_parquet(
+        week_df[["start_station_id", "hour", "prediction"]], out_path,
+        sort_by=["hour", "start_station_id"],
+    )
     project.get_dataset_api().upload(
         str(out_path), "Resources/predictions", overwrite=True
     )
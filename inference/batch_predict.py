@@ -11,6 +11,7 @@ batch_predict.py
 from pathlib import Path
 import datetime as dt
 import os
+import sys
 
 import pandas as pd
 import numpy as np
@@ -23,6 +24,11 @@ import os
 
 load_dotenv()
 
+# repo root on sys.path so every script imports citibike_common the same way
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from citibike_common.model_io import load_booster
+from citibike_common.parquet_io import load_feature_group_cached, write_parquet
+
 FORCED_API_KEY = os.getenv("HOPSWORKS_API_KEY")
 # ─────────────────── Config ────────────────────
 CFG = yaml.safe_load(open(Path("./configs/config.yaml")))
@@ -47,48 +53,44 @@ def main():
     mlflow.set_tracking_uri(CFG["mlflow"]["tracking_uri"])
 
     # 2️⃣  Read latest feature snapshot
-    feat_fg = fs.get_feature_group("citibike_features", version=1)
-    feat_df = feat_fg.read()                         # pandas
-    lag_cols = _sort_lags([c for c in feat_df.columns if c.startswith(LAG_COL_PATTERN)])
-
-    last_ts = feat_df["hour"].max()                  # tz-aware
-    # last rows for ALL start stations (multi-row DF)
-    current_df = feat_df[feat_df["hour"] == last_ts].copy()
+    last_ts = load_feature_group_cached(fs, "citibike_features", 1, columns=["hour"])["hour"].max()  # tz-aware
+    # last rows for ALL start stations (multi-row DF), filtered on read
+    current_df = load_feature_group_cached(
+        fs, "citibike_features", 1, filters=[("hour", "==", last_ts)]
+    )
+    lag_cols = _sort_lags([c for c in current_df.columns if c.startswith(LAG_COL_PATTERN)])
 
     # 3️⃣  Load latest model
     mr = project.get_model_registry()
     model_meta = mr.get_model("citibike_best")       # latest version by default
     model_dir  = model_meta.download()               # local folder :contentReference[oaicite:0]{index=0}
-    model      = mlflow.pyfunc.load_model(model_dir)
+    booster    = load_booster(model_dir)
+    # the booster may use only a top-k subset of the lags, in its own order
+    feat_idx   = [lag_cols.index(c) for c in booster.feature_name()]
 
-    # 4️⃣  Roll forward 24 h autoregressively
-    preds_list = []
+    # 4️⃣  Roll forward 24 h autoregressively on one contiguous lag matrix
+    lags_arr    = current_df[lag_cols].to_numpy(dtype=np.float32, copy=True)
+    station_ids = current_df["start_station_id"].to_numpy()
+    n_stations  = len(station_ids)
+    out = np.empty((PREDIC_HORIZON_H, n_stations), dtype=np.float64)
 
     for step in range(PREDIC_HORIZON_H):
-        # predict
-        X = current_df[lag_cols]
-        preds = model.predict(X)
-
-        # collect output rows
-        out = current_df[["start_station_id"]].copy()
-        out["hour"] = current_df["hour"] + pd.Timedelta(hours=step + 1)
-        out["prediction"] = preds
-        preds_list.append(out)
-
-        # build next_df for next step
-        next_df = current_df.copy()
-        next_df["hour"] = out["hour"]               # advance 1 h
-        # shift lags: lag_2 ← lag_1, lag_3 ← lag_2, …, lag_N ← lag_{N-1}
-        next_df[lag_cols[1:]] = current_df[lag_cols[:-1]].values
-        next_df[lag_cols[0]]  = preds               # new lag_1 = current prediction
-        next_df["rides"]      = preds               # keep “rides” consistent
-        current_df = next_df                        # loop
-
-    pred_df = pd.concat(preds_list, ignore_index=True)
+        preds = booster.predict(lags_arr[:, feat_idx])
+        out[step] = preds
+        # shift lags in place: lag_2 ← lag_1, …, lag_N ← lag_{N-1}; new lag_1 = prediction
+        lags_arr[:, 1:] = lags_arr[:, :-1]
+        lags_arr[:, 0]  = preds
+
+    hours = pd.date_range(last_ts + pd.Timedelta(hours=1), periods=PREDIC_HORIZON_H, freq="h")
+    pred_df = pd.DataFrame({
+        "start_station_id": np.tile(station_ids, PREDIC_HORIZON_H),
+        "hour":             hours.repeat(n_stations),
+        "prediction":       out.ravel(),
+    })
 
     # 5️⃣  Persist parquet (for Streamlit)
     parquet_path = Path("predictions.parquet")
-    pred_df.to_parquet(parquet_path, index=False)
+    write_parquet(pred_df, parquet_path, sort_by=["hour", "start_station_id"])
     project.get_dataset_api().upload(
         str(parquet_path), "Resources/predictions", overwrite=True
     )
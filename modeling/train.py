@@ -9,13 +9,15 @@ train.py ― Citi Bike hourly-rides forecasting
 
 import os
 import shutil
+import sys
 from pathlib import Path
 import datetime as dt
 
+import numpy as np
 import pandas as pd
 import lightgbm as lgb
 import mlflow
-import mlflow.sklearn
+import mlflow.lightgbm
 from mlflow.tracking import MlflowClient
 from sklearn.metrics import mean_absolute_error
 
@@ -23,6 +25,10 @@ import hopsworks
 
 from utils import CFG   # your yaml-backed config object
 
+# repo root on sys.path so every script imports citibike_common the same way
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from citibike_common.parquet_io import load_feature_group_cached
+
 import os
 
 FORCED_API_KEY = os.getenv("HOPSWORKS_API_KEY")
@@ -31,24 +37,23 @@ FORCED_API_KEY = os.getenv("HOPSWORKS_API_KEY")
 def load_features(project) -> pd.DataFrame:
     """Read the ‘citibike_features’ FG (v1) and return a DataFrame."""
     fs = project.get_feature_store()
-    fg = fs.get_feature_group("citibike_features", version=1)
-    return fg.read()                     # Spark → Pandas automatically
+    return load_feature_group_cached(fs, "citibike_features", version=1)
+
 
+def make_dataset(X: np.ndarray, y: np.ndarray, feature_cols: list[str]) -> lgb.Dataset:
+    """Binned LightGBM Dataset from float32 arrays; raw rows are freed once constructed."""
+    return lgb.Dataset(X, y, feature_name=feature_cols, free_raw_data=True)
 
-def train_model(df: pd.DataFrame, feature_cols: list[str]):
-    """Train LightGBM and return (model, MAE on test split)."""
-    X = df[feature_cols]
-    y = df["rides"]
 
-    split_idx = int(len(df) * (1 - CFG["training"]["test_ratio"]))
-    X_train, X_test = X.iloc[:split_idx], X.iloc[split_idx:]
-    y_train, y_test = y.iloc[:split_idx], y.iloc[split_idx:]
+def train_model(X: np.ndarray, y: np.ndarray, feature_cols: list[str], split_idx: int):
+    """Train LightGBM on a time-ordered float32 matrix and return (booster, MAE on test split)."""
+    dtrain = make_dataset(X[:split_idx], y[:split_idx], feature_cols)
 
-    model = lgb.LGBMRegressor(**CFG["model"]["lgb_params"])
-    model.fit(X_train, y_train)
+    # sklearn-style keys in lgb_params (n_estimators, subsample, …) are LightGBM aliases
+    model = lgb.train(dict(CFG["model"]["lgb_params"]), dtrain)
 
-    preds = model.predict(X_test)
-    mae = mean_absolute_error(y_test, preds)
+    preds = model.predict(X[split_idx:])
+    mae = mean_absolute_error(y[split_idx:], preds)
     return model, mae
 
 
@@ -82,7 +87,7 @@ def main() -> None:
     # 2️⃣  ── Start an MLflow run
     mlflow.set_experiment(CFG["mlflow"]["experiment_name"])
     with mlflow.start_run(run_name="citibike_training") as run:
-        models: dict[str, tuple[lgb.LGBMRegressor, float] | None] = {}
+        models: dict[str, tuple[lgb.Booster, float] | None] = {}
 
         # Baseline (yesterday same hour)
         df["baseline"] = df["lag_24"]
@@ -90,21 +95,28 @@ def main() -> None:
         mlflow.log_metric("baseline_mae", mae_base)
         models["baseline"] = None   # no artefact to store
 
-        # Full-lag model
+        # Materialise features/target once; both models train on slices of these
         full_feats = [c for c in df.columns if c.startswith("lag_")]
-        m_full, mae_full = train_model(df, full_feats)
+        X_full = df[full_feats].to_numpy(dtype=np.float32)
+        y      = df["rides"].to_numpy(dtype=np.float32)
+        split_idx = int(len(df) * (1 - CFG["training"]["test_ratio"]))
+
+        # Full-lag model
+        m_full, mae_full = train_model(X_full, y, full_feats, split_idx)
         mlflow.log_metric("full_mae", mae_full)
-        mlflow.sklearn.log_model(m_full, "full_lag_model")
+        mlflow.lightgbm.log_model(m_full, "full_lag_model")
         models["full"] = (m_full, mae_full)
 
         # Top-k model (feature-importance pruning)
-        importances = m_full.booster_.feature_importance(importance_type="gain")
+        importances = m_full.feature_importance(importance_type="gain")
         imp_series = pd.Series(importances, index=full_feats).sort_values(ascending=False)
         topk_feats = imp_series.head(CFG["model"]["features_top_k"]).index.tolist()
 
-        m_top, mae_top = train_model(df, topk_feats)
+        topk_idx = np.fromiter((full_feats.index(c) for c in topk_feats), dtype=np.intp)
+
+        m_top, mae_top = train_model(X_full[:, topk_idx], y, topk_feats, split_idx)
         mlflow.log_metric("topk_mae", mae_top)
-        mlflow.sklearn.log_model(m_top, "topk_model")
+        mlflow.lightgbm.log_model(m_top, "topk_model")
         models["topk"] = (m_top, mae_top)
 
         # 3️⃣  ── Pick best model (lowest MAE)
@@ -130,19 +142,21 @@ def main() -> None:
         local_model_dir = Path("tmp_raw/best_model").resolve()
         if local_model_dir.exists():
             shutil.rmtree(local_model_dir)
-        mlflow.sklearn.save_model(best_model, str(local_model_dir))
+        mlflow.lightgbm.save_model(best_model, str(local_model_dir))
+        # raw booster text for inference without the pyfunc wrapper
+        best_model.save_model(str(local_model_dir / "model.txt"))
 
     # 5️⃣  ── Upload to Hopsworks Model Registry
     mr = project.get_model_registry()
-    skl_meta = mr.sklearn.create_model(
+    py_meta = mr.python.create_model(
         name        = "citibike_best",
         metrics     = {"mae": best_mae},
         description = "Best LightGBM model for hourly Citi Bike rides prediction",
         input_example = df.iloc[[0]],
     )
-    skl_meta.save(str(local_model_dir))     # uploads artefacts
+    py_meta.save(str(local_model_dir))      # uploads artefacts
     print(
-        f"✅  Uploaded model version {skl_meta.version} (MAE = {best_mae:.4f}) to "
+        f"✅  Uploaded model version {py_meta.version} (MAE = {best_mae:.4f}) to "
         f"Hopsworks Model Registry and promoted v{version} in MLflow."
     )
 
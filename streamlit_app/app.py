@@ -0,0 +1,11 @@
+# app.py ─────────────────────────────────────────────────────────────
+# Citi Bike Forecast & Monitoring dashboard (Streamlit) — entry script;
+# all logic lives in citibike_dashboard/core.py
+# -------------------------------------------------------------------
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from citibike_dashboard import core
+
+core.main()